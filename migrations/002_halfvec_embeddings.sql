@@ -0,0 +1,33 @@
+-- Store embeddings as halfvec (float16) instead of vector (float32).
+-- Halves table size, shared_buffers pressure, and HNSW index memory;
+-- retrieval recall loss at fp16 is negligible for this workload.
+-- Requires pgvector >= 0.7.
+
+-- The langchain_pg_embedding table is created by LangChain on first
+-- ingest; run this migration after at least one ingest has happened.
+
+-- Deploy note: the service now requests 768-dim embeddings
+-- (outputDimensionality in rag/embeddings.py). Against a knowledge base
+-- ingested before that change, every /chat fails with a vector dimension
+-- mismatch until this migration converts the stored rows — apply it as
+-- part of the same deploy.
+
+-- Drop before the type change: the index may exist with
+-- vector_cosine_ops (the bulk-load rebuild path creates it that way),
+-- and ALTER TYPE cannot rebuild that opclass over halfvec.
+DROP INDEX IF EXISTS langchain_pg_embedding_embedding_idx;
+
+-- Truncate pre-existing 3072-dim rows to 768 and re-normalize to unit
+-- length: the server-side equivalent of what the client now does with
+-- outputDimensionality + normalization.
+ALTER TABLE langchain_pg_embedding
+    ALTER COLUMN embedding TYPE halfvec(768)
+    USING l2_normalize(subvector(embedding, 1, 768))::halfvec(768);
+
+SET maintenance_work_mem = '2GB';
+SET max_parallel_maintenance_workers = 8;
+
+CREATE INDEX langchain_pg_embedding_embedding_idx
+    ON langchain_pg_embedding
+    USING hnsw (embedding halfvec_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
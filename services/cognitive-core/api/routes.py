@@ -1,12 +1,17 @@
+import asyncio
+import functools
 import logging
+import multiprocessing
 import os
-from fastapi import APIRouter, HTTPException, Header, UploadFile, File, BackgroundTasks
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import APIRouter, HTTPException, Header, UploadFile, File
 import tempfile
 import shutil
 
 from schemas.message import ChatRequest, ChatResponse
 from rag.pipeline import run_pipeline
-from rag.ingestion import ingest_file
+from rag.ingestion import ingest_worker
 from llm.client import get_llm
 
 logger = logging.getLogger(__name__)
@@ -14,6 +19,44 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _make_ingest_pool() -> ProcessPoolExecutor:
+    # spawn, not fork: workers are started lazily from a live uvicorn
+    # process with an event loop and worker threads, and forking that can
+    # deadlock the child on locks held at fork time (ssl, malloc arenas)
+    return ProcessPoolExecutor(
+        max_workers=2,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+# Ingestion is CPU-bound (chunking, vector serialization, COPY formatting);
+# running it in worker processes keeps the event-loop thread responsive
+# and isolates crashes from the API process.
+_ingest_pool = _make_ingest_pool()
+
+
+def _on_ingest_done(future, path: str, filename: str):
+    """Surface worker-process failures the worker itself cannot log.
+
+    If a worker dies (e.g. OOM-killed mid-embed), the exception only
+    exists on the future, the worker's own temp-file cleanup never ran,
+    and a BrokenProcessPool leaves the executor permanently unusable —
+    recreate it so later ingests still run.
+    """
+    global _ingest_pool
+    exc = future.exception()
+    if exc is None:
+        return
+    logger.error(f"Ingestion worker failed for {filename}: {exc}")
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+    if isinstance(exc, BrokenProcessPool):
+        logger.error("Ingestion process pool broken; recreating it")
+        _ingest_pool = _make_ingest_pool()
+
+
 @router.get("/health")
 async def health():
     return {"status": "ok"}
@@ -21,12 +64,10 @@ async def health():
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
-    history = [msg.model_dump() for msg in request.conversation_history]
-
     try:
         result = await run_pipeline(
             message=request.message,
-            conversation_history=history,
+            conversation_history=request.conversation_history,
         )
     except Exception as e:
         logger.error(f"Pipeline error: {e}", exc_info=True)
@@ -45,7 +86,6 @@ async def chat(request: ChatRequest):
 
 @router.post("/admin/ingest")
 async def admin_ingest(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     authorization: str = Header(...),
 ):
@@ -58,26 +98,22 @@ async def admin_ingest(
     if ext not in (".pdf", ".txt"):
         raise HTTPException(status_code=400, detail="Only .pdf and .txt files supported")
 
-    # Save uploaded file to temp location
+    # Save uploaded file to temp location; 1 MiB buffer keeps syscall
+    # count low for multi-MB PDFs
     tmp = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
     try:
-        shutil.copyfileobj(file.file, tmp)
+        shutil.copyfileobj(file.file, tmp, length=1024 * 1024)
         tmp.close()
     except Exception:
         tmp.close()
         os.unlink(tmp.name)
         raise
 
-    def _ingest(path: str):
-        try:
-            count = ingest_file(path)
-            logger.info(f"Background ingestion complete: {count} chunks from {file.filename}")
-        except Exception as e:
-            logger.error(f"Background ingestion failed: {e}", exc_info=True)
-        finally:
-            os.unlink(path)
-
-    background_tasks.add_task(_ingest, tmp.name)
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_ingest_pool, ingest_worker, tmp.name, file.filename)
+    future.add_done_callback(
+        functools.partial(_on_ingest_done, path=tmp.name, filename=file.filename)
+    )
 
     return {
         "status": "ingestion_started",
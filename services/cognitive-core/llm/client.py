@@ -1,9 +1,15 @@
+import functools
 import os
 from langchain_core.language_models import BaseChatModel
 
 
+@functools.lru_cache(maxsize=1)
 def get_llm() -> BaseChatModel:
-    """Factory function to get the LLM based on LLM_PROVIDER env var."""
+    """Factory function to get the LLM based on LLM_PROVIDER env var.
+
+    Cached so the client (and its HTTP pool) is built once per process;
+    the provider env vars are stable for the lifetime of the container.
+    """
     provider = os.getenv("LLM_PROVIDER", "anthropic").lower()
 
     if provider == "anthropic":
@@ -1,10 +1,44 @@
+import logging
 import os
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from api.routes import router
 
-app = FastAPI(title="Maya Genie - Cognitive Core")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Prime the cached LLM, retriever, and chain singletons so the first
+    # /chat request doesn't pay for heavy langchain imports and client
+    # construction
+    from llm.client import get_llm
+    from rag.retriever import get_retriever
+    from rag.pipeline import build_chain
+
+    # Warm-up is best-effort: if the database or provider is unreachable
+    # at boot, start anyway and let the factories retry lazily — a failed
+    # lru_cache call is not cached, so the first request rebuilds them.
+    try:
+        llm = get_llm()
+        get_retriever(k=4)
+        build_chain()
+        # Dummy call warms the provider's TLS connection pool
+        await llm.ainvoke("ping")
+    except Exception as e:
+        logger.warning(f"Startup warm-up failed, continuing without it: {e}")
+    yield
+
+
+app = FastAPI(
+    title="Maya Genie - Cognitive Core",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 app.include_router(router)
 
 if __name__ == "__main__":
@@ -1,7 +1,44 @@
+import asyncio
+import collections
+import math
 import os
+import random
+import threading
+import time
+import httpx
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from langchain_core.embeddings import Embeddings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# batchEmbedContents accepts at most 100 requests per call
+BATCH_SIZE = 100
+# Keep each batch well under the request token ceiling
+MAX_BATCH_TOKENS = 20_000
+# Recent query embeddings kept in memory; chat traffic repeats heavily
+QUERY_CACHE_SIZE = 2048
+# Matches the halfvec(768) column from migration 002; gemini-embedding-001
+# natively returns 3072 dims, so we ask the API to truncate
+OUTPUT_DIMENSIONS = 768
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count; ~4 characters per token for English/Nepali text."""
+    return len(text) // 4
+
+
+def _normalize(vec: List[float]) -> List[float]:
+    """Scale a vector to unit length.
+
+    Gemini embeddings truncated below 3072 dims are not unit-length,
+    which would skew cosine distance in pgvector.
+    """
+    norm = math.sqrt(sum(v * v for v in vec))
+    if norm == 0:
+        return vec
+    return [v / norm for v in vec]
 
 
 class GeminiRESTEmbeddings(Embeddings):
@@ -12,27 +49,217 @@ class GeminiRESTEmbeddings(Embeddings):
         self,
         model: str = "models/gemini-embedding-001",
         api_key: str = None,
+        max_concurrency: int = 5,
+        tokens_per_minute: int = 100_000,
     ):
         self.model = model
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        # Rolling 60s window of (timestamp, tokens) shared by all
+        # concurrent batch submitters
+        self._token_window = collections.deque()
+        self._rate_lock = threading.Lock()
+        # LRU of normalized query text -> embedding
+        self._query_cache = collections.OrderedDict()
+        self._query_cache_lock = threading.Lock()
         self._url = f"https://generativelanguage.googleapis.com/v1beta/{model}:embedContent"
+        self._batch_url = f"https://generativelanguage.googleapis.com/v1beta/{model}:batchEmbedContents"
+        # Keep TCP+TLS connections warm across calls; retry transient errors
+        self._session = requests.Session()
+        self._session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=10,
+                pool_maxsize=20,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=["POST"],
+                ),
+            ),
+        )
+        self._async_client = None
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # Created lazily so sync-only callers (the ingestion CLI) never
+        # touch the event loop
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=120,
+                limits=httpx.Limits(max_connections=20),
+            )
+        return self._async_client
 
     def _embed(self, text: str, task_type: str) -> List[float]:
-        resp = requests.post(
+        resp = self._session.post(
             self._url,
             params={"key": self.api_key},
             json={
                 "model": self.model,
                 "content": {"parts": [{"text": text}]},
                 "taskType": task_type,
+                "outputDimensionality": OUTPUT_DIMENSIONS,
             },
             timeout=30,
         )
         resp.raise_for_status()
-        return resp.json()["embedding"]["values"]
+        return _normalize(resp.json()["embedding"]["values"])
+
+    def _make_batches(self, texts: List[str]) -> List[List[str]]:
+        """Group texts into batches bounded by both item count and
+        estimated tokens, so a batch never blows through the per-minute
+        token budget in one shot."""
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for text in texts:
+            tokens = _estimate_tokens(text)
+            if current and (
+                len(current) >= BATCH_SIZE
+                or current_tokens + tokens > MAX_BATCH_TOKENS
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _throttle(self, tokens: int) -> None:
+        """Block until the rolling 60s token spend has room for `tokens`."""
+        with self._rate_lock:
+            now = time.monotonic()
+            while self._token_window and now - self._token_window[0][0] > 60:
+                self._token_window.popleft()
+            spent = sum(t for _, t in self._token_window)
+            if self._token_window and spent + tokens > self.tokens_per_minute:
+                wait = 60 - (now - self._token_window[0][0])
+                if wait > 0:
+                    time.sleep(wait)
+            self._token_window.append((time.monotonic(), tokens))
+
+    def _batch_embed(self, texts: List[str], task_type: str) -> List[List[float]]:
+        """Embed up to BATCH_SIZE texts in a single HTTP round-trip."""
+        self._throttle(sum(_estimate_tokens(t) for t in texts))
+        resp = self._session.post(
+            self._batch_url,
+            params={"key": self.api_key},
+            json={
+                "requests": [
+                    {
+                        "model": self.model,
+                        "content": {"parts": [{"text": t}]},
+                        "taskType": task_type,
+                        "outputDimensionality": OUTPUT_DIMENSIONS,
+                    }
+                    for t in texts
+                ],
+            },
+            timeout=120,
+        )
+        resp.raise_for_status()
+        return [_normalize(e["values"]) for e in resp.json()["embeddings"]]
+
+    def _batch_embed_jittered(self, texts: List[str], task_type: str) -> List[List[float]]:
+        # Small random delay spreads out simultaneous submits so concurrent
+        # batches don't all hit the API (and its 429s) at the same instant.
+        time.sleep(random.uniform(0, 0.05))
+        return self._batch_embed(texts, task_type)
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        return [self._embed(t, "RETRIEVAL_DOCUMENT") for t in texts]
+        groups = self._make_batches(texts)
+        if len(groups) <= 1:
+            return sum((self._batch_embed(g, "RETRIEVAL_DOCUMENT") for g in groups), [])
+
+        results: List[List[List[float]]] = [None] * len(groups)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = {
+                pool.submit(self._batch_embed_jittered, g, "RETRIEVAL_DOCUMENT"): i
+                for i, g in enumerate(groups)
+            }
+            for future, i in futures.items():
+                results[i] = future.result()
+        return sum(results, [])
+
+    def _query_cache_get(self, key: str) -> List[float] | None:
+        with self._query_cache_lock:
+            vec = self._query_cache.get(key)
+            if vec is not None:
+                self._query_cache.move_to_end(key)
+            return vec
+
+    def _query_cache_put(self, key: str, vec: List[float]) -> None:
+        with self._query_cache_lock:
+            self._query_cache[key] = vec
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
 
     def embed_query(self, text: str) -> List[float]:
-        return self._embed(text, "RETRIEVAL_QUERY")
+        key = text.strip().lower()
+        cached = self._query_cache_get(key)
+        if cached is not None:
+            return cached
+        vec = self._embed(text, "RETRIEVAL_QUERY")
+        self._query_cache_put(key, vec)
+        return vec
+
+    async def _aembed(self, text: str, task_type: str) -> List[float]:
+        resp = await self._get_async_client().post(
+            self._url,
+            params={"key": self.api_key},
+            json={
+                "model": self.model,
+                "content": {"parts": [{"text": text}]},
+                "taskType": task_type,
+                "outputDimensionality": OUTPUT_DIMENSIONS,
+            },
+        )
+        resp.raise_for_status()
+        return _normalize(resp.json()["embedding"]["values"])
+
+    async def _abatch_embed(self, texts: List[str], task_type: str) -> List[List[float]]:
+        # _throttle may sleep; keep that off the event loop
+        await asyncio.to_thread(
+            self._throttle, sum(_estimate_tokens(t) for t in texts)
+        )
+        resp = await self._get_async_client().post(
+            self._batch_url,
+            params={"key": self.api_key},
+            json={
+                "requests": [
+                    {
+                        "model": self.model,
+                        "content": {"parts": [{"text": t}]},
+                        "taskType": task_type,
+                        "outputDimensionality": OUTPUT_DIMENSIONS,
+                    }
+                    for t in texts
+                ],
+            },
+        )
+        resp.raise_for_status()
+        return [_normalize(e["values"]) for e in resp.json()["embeddings"]]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        groups = self._make_batches(texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _bounded(group: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self._abatch_embed(group, "RETRIEVAL_DOCUMENT")
+
+        results = await asyncio.gather(*(_bounded(g) for g in groups))
+        return sum(results, [])
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = text.strip().lower()
+        cached = self._query_cache_get(key)
+        if cached is not None:
+            return cached
+        vec = await self._aembed(text, "RETRIEVAL_QUERY")
+        self._query_cache_put(key, vec)
+        return vec
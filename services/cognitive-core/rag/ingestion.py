@@ -5,10 +5,15 @@ Usage:
 """
 
 import argparse
+import hashlib
+import io
+import json
 import os
 import logging
+import uuid
 
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
+import psycopg2
+from langchain_community.document_loaders import PyMuPDFLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import PGVector
 from rag.embeddings import GeminiRESTEmbeddings
@@ -19,6 +24,135 @@ COLLECTION_NAME = "mandala_public_kb"
 CHUNK_SIZE = 512
 CHUNK_OVERLAP = 64
 
+# Above this many chunks it is cheaper to drop the HNSW index, COPY, and
+# rebuild than to maintain the graph incrementally during insertion.
+REINDEX_THRESHOLD = 1000
+HNSW_INDEX_NAME = "langchain_pg_embedding_embedding_idx"
+
+
+def _copy_escape(value: str) -> str:
+    """Escape a value for PostgreSQL's text COPY format."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _get_or_create_collection(cur) -> str:
+    """Return the collection UUID, inserting the row if missing."""
+    cur.execute(
+        "SELECT uuid FROM langchain_pg_collection WHERE name = %s",
+        (COLLECTION_NAME,),
+    )
+    row = cur.fetchone()
+    if row:
+        return str(row[0])
+    collection_id = str(uuid.uuid4())
+    cur.execute(
+        "INSERT INTO langchain_pg_collection (uuid, name, cmetadata) VALUES (%s, %s, %s)",
+        (collection_id, COLLECTION_NAME, json.dumps({})),
+    )
+    return collection_id
+
+
+def _embedding_opclass(cur) -> str:
+    """Pick the HNSW operator class matching the embedding column's
+    actual type (halfvec after migration 002, vector before it)."""
+    cur.execute(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = 'langchain_pg_embedding'::regclass "
+        "AND attname = 'embedding'"
+    )
+    row = cur.fetchone()
+    col_type = row[0] if row else ""
+    if col_type.startswith("halfvec"):
+        return "halfvec_cosine_ops"
+    return "vector_cosine_ops"
+
+
+def _drop_hnsw_index(conn) -> None:
+    """Best-effort: drop the HNSW index so COPY skips graph maintenance."""
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP INDEX IF EXISTS {HNSW_INDEX_NAME}")
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f"Could not drop HNSW index before bulk load: {e}")
+
+
+def _rebuild_hnsw_index(conn) -> None:
+    """Best-effort: recreate the HNSW index after a bulk load.
+
+    Runs in its own transaction so a failure here (e.g. a dimensionless
+    vector column on a pre-migration database) cannot roll back the
+    already-committed COPY.
+    """
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                opclass = _embedding_opclass(cur)
+                cur.execute("SET maintenance_work_mem = '2GB'")
+                cur.execute("SET max_parallel_maintenance_workers = 8")
+                cur.execute(
+                    f"CREATE INDEX IF NOT EXISTS {HNSW_INDEX_NAME} "
+                    "ON langchain_pg_embedding "
+                    f"USING hnsw (embedding {opclass}) "
+                    "WITH (m = 16, ef_construction = 64)"
+                )
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f"Could not rebuild HNSW index after bulk load: {e}")
+
+
+def _copy_chunks(chunks, vectors) -> None:
+    """Bulk-load chunks and their embeddings via COPY ... FROM STDIN.
+
+    One COPY statement replaces the per-row INSERTs that
+    PGVector.from_documents issues through SQLAlchemy.
+    """
+    rebuild_index = len(chunks) > REINDEX_THRESHOLD
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+    try:
+        if rebuild_index:
+            logger.info(
+                f"Bulk load of {len(chunks)} chunks: dropping HNSW index for rebuild"
+            )
+            _drop_hnsw_index(conn)
+        with conn:
+            with conn.cursor() as cur:
+                collection_id = _get_or_create_collection(cur)
+                buf = io.StringIO()
+                for chunk, vec in zip(chunks, vectors):
+                    buf.write(
+                        "\t".join(
+                            [
+                                collection_id,
+                                # Compact JSON doubles as pgvector's [v1,v2,...] input syntax
+                                json.dumps(vec, separators=(",", ":")),
+                                _copy_escape(chunk.page_content),
+                                _copy_escape(json.dumps(chunk.metadata)),
+                                str(uuid.uuid4()),
+                                str(uuid.uuid4()),
+                            ]
+                        )
+                        + "\n"
+                    )
+                buf.seek(0)
+                cur.copy_expert(
+                    "COPY langchain_pg_embedding "
+                    "(collection_id, embedding, document, cmetadata, custom_id, uuid) "
+                    "FROM STDIN",
+                    buf,
+                )
+        if rebuild_index:
+            logger.info("Rebuilding HNSW index after bulk load")
+            _rebuild_hnsw_index(conn)
+    finally:
+        conn.close()
+
 
 def ingest_file(file_path: str) -> int:
     """Load, chunk, embed and upsert a file into pgvector.
@@ -28,7 +162,8 @@ def ingest_file(file_path: str) -> int:
     # Load document
     ext = os.path.splitext(file_path)[1].lower()
     if ext == ".pdf":
-        loader = PyPDFLoader(file_path)
+        # MuPDF (C library) extracts text several times faster than pypdf
+        loader = PyMuPDFLoader(file_path)
     elif ext in (".txt", ".text"):
         loader = TextLoader(file_path)
     else:
@@ -45,22 +180,51 @@ def ingest_file(file_path: str) -> int:
     chunks = splitter.split_documents(documents)
     logger.info(f"Split into {len(chunks)} chunks")
 
-    # Embed and upsert
-    embeddings = GeminiRESTEmbeddings()
-    connection_string = os.getenv("DATABASE_URL")
+    # Embed only unique texts: catalogs repeat headers/footers across pages,
+    # and the API cost is linear in unique chunks, not total chunks
+    def _chunk_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
 
-    PGVector.from_documents(
-        documents=chunks,
-        embedding=embeddings,
+    unique = {}
+    for chunk in chunks:
+        unique.setdefault(_chunk_key(chunk.page_content), chunk.page_content)
+    if len(unique) < len(chunks):
+        logger.info(f"Deduplicated {len(chunks) - len(unique)} repeated chunks before embedding")
+
+    embeddings = GeminiRESTEmbeddings()
+    unique_vectors = embeddings.embed_documents(list(unique.values()))
+    vector_by_key = dict(zip(unique.keys(), unique_vectors))
+    vectors = [vector_by_key[_chunk_key(c.page_content)] for c in chunks]
+
+    # Instantiating PGVector creates the langchain tables on a fresh database;
+    # the bulk insert itself goes through COPY below.
+    PGVector(
+        connection_string=os.getenv("DATABASE_URL"),
+        embedding_function=embeddings,
         collection_name=COLLECTION_NAME,
-        connection_string=connection_string,
-        pre_delete_collection=False,
     )
+    _copy_chunks(chunks, vectors)
 
     logger.info(f"Ingested {len(chunks)} chunks into collection '{COLLECTION_NAME}'")
     return len(chunks)
 
 
+def ingest_worker(path: str, filename: str) -> None:
+    """Entry point for ingestion pool worker processes.
+
+    Lives here (not in api.routes) so spawn-started workers can import it
+    without re-executing the API module and its executor setup.
+    """
+    logging.basicConfig(level=logging.INFO)
+    try:
+        count = ingest_file(path)
+        logger.info(f"Background ingestion complete: {count} chunks from {filename}")
+    except Exception as e:
+        logger.error(f"Background ingestion failed: {e}", exc_info=True)
+    finally:
+        os.unlink(path)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Ingest documents into pgvector")
     parser.add_argument("--file", required=True, help="Path to PDF or text file")
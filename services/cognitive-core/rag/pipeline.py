@@ -1,10 +1,12 @@
+import functools
 import logging
 from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferWindowMemory
+from langchain.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage, AIMessage
 
 from llm.client import get_llm
 from rag.retriever import get_retriever
+from schemas.message import ConversationMessage
 
 logger = logging.getLogger(__name__)
 
@@ -16,71 +18,73 @@ code-switches between Nepali and English, respond in the same language they used
 Always base your answers on the retrieved product information provided to you.
 Never make up nutritional claims not present in the context."""
 
+# Keep only the last N exchanges, matching the old buffer-window memory
+HISTORY_WINDOW = 10
 
-def build_chain(conversation_history: list[dict] | None = None):
-    """Build a ConversationalRetrievalChain with memory from request history."""
-    llm = get_llm()
-    retriever = get_retriever(k=4)
-
-    memory = ConversationBufferWindowMemory(
-        k=10,
-        memory_key="chat_history",
-        return_messages=True,
-        output_key="answer",
-    )
-
-    # Populate memory from conversation history
-    if conversation_history:
-        for msg in conversation_history:
-            if msg["role"] == "user":
-                memory.chat_memory.add_message(HumanMessage(content=msg["content"]))
-            elif msg["role"] == "assistant":
-                memory.chat_memory.add_message(AIMessage(content=msg["content"]))
-
-    chain = ConversationalRetrievalChain.from_llm(
-        llm=llm,
-        retriever=retriever,
-        memory=memory,
-        return_source_documents=True,
-        combine_docs_chain_kwargs={"prompt": _build_prompt()},
-        verbose=False,
-    )
-    return chain
-
-
-def _build_prompt():
-    from langchain.prompts import PromptTemplate
-    template = f"""{SYSTEM_PROMPT}
+_PROMPT = PromptTemplate(
+    template=f"""{SYSTEM_PROMPT}
 
 Context from knowledge base:
 {{context}}
 
 Question: {{question}}
 
-Answer:"""
-    return PromptTemplate(
-        template=template,
-        input_variables=["context", "question"],
+Answer:""",
+    input_variables=["context", "question"],
+)
+
+
+@functools.lru_cache(maxsize=1)
+def build_chain():
+    """Build the ConversationalRetrievalChain once per process.
+
+    The chain is stateless; per-request history is passed to invoke()
+    as `chat_history` instead of being baked into a memory object.
+    """
+    return ConversationalRetrievalChain.from_llm(
+        llm=get_llm(),
+        retriever=get_retriever(k=4),
+        return_source_documents=True,
+        combine_docs_chain_kwargs={"prompt": _PROMPT},
+        verbose=False,
     )
 
 
+def _history_messages(conversation_history: list[ConversationMessage] | None) -> list:
+    """Convert request history models into LangChain messages."""
+    if not conversation_history:
+        return []
+    messages = [
+        HumanMessage(content=msg.content)
+        if msg.role == "user"
+        else AIMessage(content=msg.content)
+        for msg in conversation_history
+        if msg.role in ("user", "assistant")
+    ]
+    return messages[-HISTORY_WINDOW * 2:]
+
+
 async def run_pipeline(
     message: str,
-    conversation_history: list[dict] | None = None,
+    conversation_history: list[ConversationMessage] | None = None,
 ) -> dict:
     """Run the RAG pipeline and return response with sources."""
-    chain = build_chain(conversation_history)
-    result = chain.invoke({"question": message})
+    chain = build_chain()
+    result = await chain.ainvoke({
+        "question": message,
+        "chat_history": _history_messages(conversation_history),
+    })
 
+    seen = set()
     sources = []
-    if result.get("source_documents"):
-        for doc in result["source_documents"]:
-            source = doc.metadata.get("source", "unknown")
-            page = doc.metadata.get("page")
-            if page is not None:
-                source = f"{source}_page_{page}"
-            if source not in sources:
-                sources.append(source)
+    for doc in result.get("source_documents") or []:
+        source = doc.metadata.get("source", "unknown")
+        page = doc.metadata.get("page")
+        if page is not None:
+            source = f"{source}_page_{page}"
+        if source not in seen:
+            seen.add(source)
+            sources.append(source)
 
     return {
         "response": result["answer"],
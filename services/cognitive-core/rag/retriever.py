@@ -1,15 +1,47 @@
+import functools
 import os
+from types import SimpleNamespace
+
 from langchain_community.vectorstores import PGVector
 from rag.embeddings import GeminiRESTEmbeddings
 
+_vectorstore = None
+
+
+class _CachedCollectionPGVector(PGVector):
+    """Search-only PGVector that caches the collection row.
+
+    Stock PGVector issues a SELECT for the collection UUID before every
+    similarity search. The collection here is fixed, so the UUID is
+    fetched once and reused, saving one DB round-trip per /chat.
+    """
+
+    _collection_uuid = None
+
+    def get_collection(self, session):
+        if self._collection_uuid is None:
+            collection = super().get_collection(session)
+            if collection is None:
+                return None
+            self._collection_uuid = collection.uuid
+            return collection
+        return SimpleNamespace(uuid=self._collection_uuid, name=self.collection_name)
+
+
+def _get_vectorstore() -> PGVector:
+    """Build the PGVector store once per process so its connection pool
+    is shared across retriever instances."""
+    global _vectorstore
+    if _vectorstore is None:
+        _vectorstore = _CachedCollectionPGVector(
+            connection_string=os.getenv("DATABASE_URL"),
+            embedding_function=GeminiRESTEmbeddings(),
+            collection_name="mandala_public_kb",
+        )
+    return _vectorstore
+
 
+@functools.lru_cache(maxsize=8)
 def get_retriever(k: int = 4):
     """Create a PGVector retriever for the Mandala Foods knowledge base."""
-    connection_string = os.getenv("DATABASE_URL")
-    embeddings = GeminiRESTEmbeddings()
-    vectorstore = PGVector(
-        connection_string=connection_string,
-        embedding_function=embeddings,
-        collection_name="mandala_public_kb",
-    )
-    return vectorstore.as_retriever(search_kwargs={"k": k})
+    return _get_vectorstore().as_retriever(search_kwargs={"k": k})